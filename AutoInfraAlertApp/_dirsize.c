@@ -0,0 +1,179 @@
+/*
+ * Directory size walker for the Directory Size Monitor
+ *
+ * Optional C implementation of the subtree walk used by app.py. Each
+ * directory is opened relative to its parent with openat/fdopendir, the file
+ * type is taken from readdir's d_type and only regular files (or entries of
+ * unknown type) are stat'ed with fstatat. Symbolic links are skipped.
+ *
+ * Build in place with:
+ *     python setup.py build_ext --inplace
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <dirent.h>
+#include <errno.h>
+#include <fcntl.h>
+#include <stdint.h>
+#include <string.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+/*
+ * Return the next entry of dir other than "." and "..", or NULL at the end.
+ *
+ * readdir signals errors only through errno, so errno is cleared before each
+ * call; a failed read ends the listing and is counted in *skipped, like the
+ * OSError the Python walkers see in the same case.
+ */
+static struct dirent *
+next_entry(DIR *dir, uint64_t *skipped)
+{
+    for (;;) {
+        errno = 0;
+        struct dirent *ent = readdir(dir);
+        if (ent == NULL) {
+            if (errno != 0)
+                (*skipped)++;
+            return NULL;
+        }
+        const char *name = ent->d_name;
+        if (!(name[0] == '.' && (name[1] == '\0' || (name[1] == '.' && name[2] == '\0'))))
+            return ent;
+    }
+}
+
+/*
+ * Add the size of every file below name (relative to parent_fd) to *total.
+ *
+ * Returns 0 when the walk finished, 1 when it stopped because *total passed
+ * limit, and -1 with errno set when the directory itself could not be opened.
+ * Entries below it that cannot be read are skipped and counted in *skipped.
+ * *early is set when the walk stopped with entries still left unread, so the
+ * total is only a lower bound.
+ */
+static int
+walk(int parent_fd, const char *name, int nofollow, uint64_t *total,
+     uint64_t *skipped, int *early, int has_limit, uint64_t limit)
+{
+    int flags = O_RDONLY | O_DIRECTORY | O_CLOEXEC | (nofollow ? O_NOFOLLOW : 0);
+    int fd = openat(parent_fd, name, flags);
+    if (fd < 0)
+        return -1;
+
+    DIR *dir = fdopendir(fd);
+    if (dir == NULL) {
+        int saved = errno;
+        close(fd);
+        errno = saved;
+        return -1;
+    }
+
+    int stopped = 0;
+    struct dirent *ent;
+    while (!stopped && (ent = next_entry(dir, skipped)) != NULL) {
+        const char *entry = ent->d_name;
+
+        unsigned char type = ent->d_type;
+        if (type == DT_LNK)
+            continue;
+
+        if (type != DT_DIR) {
+            struct stat st;
+            if (fstatat(fd, entry, &st, AT_SYMLINK_NOFOLLOW) != 0) {
+                (*skipped)++;
+                continue;
+            }
+            if (S_ISLNK(st.st_mode))
+                continue;
+            if (S_ISDIR(st.st_mode)) {
+                type = DT_DIR;
+            } else {
+                *total += (uint64_t)st.st_size;
+            }
+        }
+
+        if (type == DT_DIR) {
+            int result = walk(fd, entry, 1, total, skipped, early, has_limit, limit);
+            if (result < 0)
+                (*skipped)++;
+            else if (result == 1)
+                stopped = 1;
+        }
+
+        if (has_limit && *total > limit)
+            stopped = 1;
+
+        if (stopped && next_entry(dir, skipped) != NULL)
+            *early = 1;
+    }
+
+    closedir(dir);
+    return stopped;
+}
+
+static PyObject *
+dirsize(PyObject *self, PyObject *args)
+{
+    PyObject *path_bytes = NULL;
+    PyObject *limit_obj = Py_None;
+    uint64_t limit = 0;
+    uint64_t total = 0;
+    uint64_t skipped = 0;
+    int early = 0;
+    int has_limit = 0;
+    int result;
+
+    if (!PyArg_ParseTuple(args, "O&|O:dirsize", PyUnicode_FSConverter, &path_bytes, &limit_obj))
+        return NULL;
+
+    if (limit_obj != Py_None) {
+        limit = PyLong_AsUnsignedLongLong(limit_obj);
+        if (PyErr_Occurred()) {
+            Py_DECREF(path_bytes);
+            return NULL;
+        }
+        has_limit = 1;
+    }
+
+    const char *path = PyBytes_AS_STRING(path_bytes);
+    Py_BEGIN_ALLOW_THREADS
+    result = walk(AT_FDCWD, path, 0, &total, &skipped, &early, has_limit, limit);
+    Py_END_ALLOW_THREADS
+
+    if (result < 0) {
+        PyErr_SetFromErrnoWithFilename(PyExc_OSError, path);
+        Py_DECREF(path_bytes);
+        return NULL;
+    }
+
+    Py_DECREF(path_bytes);
+    return Py_BuildValue("KKN", (unsigned long long)total, (unsigned long long)skipped,
+                         PyBool_FromLong(early));
+}
+
+static PyMethodDef dirsize_methods[] = {
+    {"dirsize", dirsize, METH_VARARGS,
+     "dirsize(path, limit=None) -> (int, int, bool)\n\n"
+     "Return the total size in bytes of the regular files below path, the\n"
+     "number of entries that could not be read and whether the walk stopped\n"
+     "with entries left unread. Symbolic links are skipped. If limit is\n"
+     "given the walk stops as soon as the total exceeds it."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef dirsize_module = {
+    PyModuleDef_HEAD_INIT,
+    "_dirsize",
+    "C implementation of the directory size walk",
+    -1,
+    dirsize_methods
+};
+
+PyMODINIT_FUNC
+PyInit__dirsize(void)
+{
+    return PyModule_Create(&dirsize_module);
+}
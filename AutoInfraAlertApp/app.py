@@ -14,26 +14,71 @@ Features:
 """
 
 import os
+import atexit
+import errno
+import re
 import sys
 import logging
+import logging.handlers
+import queue
+import threading
+import shelve
 import smtplib
 import configparser
 import argparse
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import collections
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.message import EmailMessage
 from datetime import datetime
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('directory_monitor.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# Optional C walker, built with "python setup.py build_ext --inplace"
+try:
+    import _dirsize
+except ImportError:
+    _dirsize = None
+
+# Set up logging. Records are queued and written by a background thread,
+# so the walker threads never wait on the log file.
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('directory_monitor.log'),
+    logging.StreamHandler(sys.stdout)
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logging.root.setLevel(logging.INFO)
+logging.root.addHandler(logging.handlers.QueueHandler(_log_queue))
 logger = logging.getLogger(__name__)
 
+# The host name does not change while the process runs
+HOSTNAME = os.uname().nodename if hasattr(os, 'uname') else os.environ.get('COMPUTERNAME', 'unknown')
+
+# Directory walks are bound by syscall latency rather than CPU, so subtrees
+# are sized concurrently. The semaphore caps how many walks (and therefore
+# open directory handles) are in flight across all callers.
+MAX_WALK_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_walk_slots = threading.BoundedSemaphore(MAX_WALK_WORKERS)
+
+# Parallel walks keep one descriptor open per directory level in every worker,
+# which is far below this; higher hard limits would only enlarge the fd table.
+MAX_OPEN_FILES = 1 << 16
+
+# Size strings such as "500", "100MB" or "1.5 GB"
+_SIZE_RE = re.compile(r'^\s*([\d.]+)\s*([KMGT]?B)?\s*$', re.IGNORECASE)
+_UNITS = {'B': 1, 'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30, 'TB': 1 << 40}
+
 def parse_size(size_str):
     """
     Convert size string with units to bytes
@@ -48,55 +93,352 @@ def parse_size(size_str):
         ValueError: If the format is invalid
     """
     try:
-        # If the string is just a number, return it as bytes
-        if size_str.isdigit():
-            return int(size_str)
+        match = _SIZE_RE.match(size_str)
+        if not match:
+            raise ValueError("Unrecognised size string")
         
-        # Extract the numeric part and the unit
-        size = float(''.join(c for c in size_str if c.isdigit() or c == '.'))
-        unit = ''.join(c for c in size_str if c.isalpha()).upper()
-        
-        # Convert to bytes based on unit
-        if unit == 'KB':
-            return int(size * 1024)
-        elif unit == 'MB':
-            return int(size * 1024 * 1024)
-        elif unit == 'GB':
-            return int(size * 1024 * 1024 * 1024)
-        elif unit == 'TB':
-            return int(size * 1024 * 1024 * 1024 * 1024)
-        else:
-            raise ValueError(f"Unknown size unit: {unit}")
+        # A bare number is taken as bytes
+        number, unit = match.group(1), (match.group(2) or 'B').upper()
+        return int(float(number) * _UNITS[unit])
     except Exception as e:
         logger.error(f"Error parsing size string '{size_str}': {str(e)}")
         raise ValueError(f"Invalid size format: {size_str}. Use format like '100MB', '1.5GB', etc.")
 
-def get_directory_size(directory):
+class _SizeTally:
+    """
+    Running byte count shared by the walker threads of one directory check
+    
+    Once the total passes the limit the exceeded event is set, which tells
+    every walker to stop. stopped_early records whether any walker then left
+    entries unread, in which case the total is only a lower bound. Entries
+    that could not be read are counted, so the check can report that its size
+    may be too low.
     """
-    Calculate the total size of a directory recursively
+    
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.total = 0
+        self.skipped = 0
+        self.stopped_early = False
+        self.exceeded = threading.Event()
+        self._lock = threading.Lock()
+    
+    def add(self, size):
+        """
+        Add a file size to the total
+        
+        Args:
+            size (int): Size in bytes
+        
+        Returns:
+            bool: True if walking should continue
+        """
+        with self._lock:
+            self.total += size
+            if self.limit is not None and self.total > self.limit:
+                self.exceeded.set()
+                return False
+        return not self.exceeded.is_set()
+    
+    def skip(self, path, error, count=1):
+        """
+        Record entries that could not be read
+        
+        Args:
+            path (str): Path of the entry, or of the directory holding the entries
+            error (Exception or str): Reason the entry was skipped
+            count (int): Number of entries skipped
+        """
+        with self._lock:
+            self.skipped += count
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Could not read {path}: {error}")
+
+def _scan_entries(it, path, tally):
+    """
+    Classify the entries of an open os.scandir iterator
+    
+    Symbolic links are skipped, as are entries that cannot be stat'ed. The file
+    type comes from the cached DirEntry data, so only files cost a stat call.
     
     Args:
-        directory (str): Path to the directory
+        it (iterator): Iterator returned by os.scandir
+        path (str): Path of the directory being listed, used for log messages
+        tally (_SizeTally): Running total that counts skipped entries
+    
+    Yields:
+        tuple: (entry, size) with size None for subdirectories
+    """
+    for entry in it:
+        try:
+            # Skip if it's a symbolic link
+            if entry.is_symlink():
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield entry, None
+            else:
+                yield entry, entry.stat(follow_symlinks=False).st_size
+        except OSError as e:
+            tally.skip(os.path.join(path, entry.name), e)
+
+def _walk_sizes(path, tally):
+    """
+    Yield the size of every regular file below a directory
+    
+    Uses os.scandir so that the file type and size come from the cached
+    DirEntry data instead of separate islink/getsize calls per file.
+    
+    Args:
+        path (str): Path to the directory
+        tally (_SizeTally): Running total that counts skipped entries
+    
+    Yields:
+        int: Size of each file in bytes
+    """
+    with os.scandir(path) as it:
+        for entry, size in _scan_entries(it, path, tally):
+            if size is not None:
+                yield size
+                continue
+            try:
+                yield from _walk_sizes(entry.path, tally)
+            except OSError as e:
+                tally.skip(entry.path, e)
+
+def _fd_walk_sizes(path, tally, name=None, dir_fd=None):
+    """
+    Yield the size of every regular file below a directory using directory descriptors
+    
+    Each directory is opened relative to its parent and listed with
+    os.scandir on the descriptor, so every file is stat'ed relative to its
+    directory (fstatat) instead of resolving the full path again. Symbolic
+    links are skipped based on the file type returned by readdir, without an
+    extra lstat. Only available on POSIX platforms.
+    
+    Args:
+        path (str): Path to the directory, used for log messages
+        tally (_SizeTally): Running total that counts skipped entries
+        name (str, optional): Name of the directory relative to dir_fd
+        dir_fd (int, optional): Descriptor of the parent directory
+    
+    Yields:
+        int: Size of each file in bytes
+    """
+    if dir_fd is None:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    else:
+        fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=dir_fd)
+    try:
+        with os.scandir(fd) as it:
+            for entry, size in _scan_entries(it, path, tally):
+                if size is not None:
+                    yield size
+                    continue
+                subdir = os.path.join(path, entry.name)
+                try:
+                    yield from _fd_walk_sizes(subdir, tally, entry.name, fd)
+                except OSError as e:
+                    tally.skip(subdir, e)
+    finally:
+        os.close(fd)
+
+def _tree_size(path, tally):
+    """
+    Add the size of a single subtree to the tally with the best walker available
+    
+    The _dirsize C extension is used when it is built; it walks the whole
+    subtree in one call, but stops once the rest of the tally's budget is used.
+    
+    Args:
+        path (str): Path to the directory
+        tally (_SizeTally): Shared running total
+    """
+    walker = _fd_walk_sizes if os.scandir in os.supports_fd else _walk_sizes
+    with _walk_slots:
+        if tally.exceeded.is_set():
+            tally.stopped_early = True
+            return
+        try:
+            if _dirsize is not None:
+                remaining = None if tally.limit is None else max(tally.limit - tally.total, 0)
+                size, skipped, early = _dirsize.dirsize(path, remaining)
+                if skipped:
+                    tally.skip(path, "entries below it could not be read", skipped)
+                if early:
+                    tally.stopped_early = True
+                tally.add(size)
+                return
+            sizes = walker(path, tally)
+            for size in sizes:
+                if not tally.add(size):
+                    # Only a lower bound if there was anything left to walk
+                    if next(sizes, None) is not None:
+                        tally.stopped_early = True
+                    break
+        except OSError as e:
+            tally.skip(path, e)
+
+def _forget_tree(cache, path):
+    """
+    Remove a directory and everything cached below it from the size cache
+    
+    Args:
+        cache (dict-like): Size cache used by _cached_tree_size
+        path (str): Absolute path of the directory
+    """
+    cached = cache.pop(path, None)
+    if cached is not None:
+        for subdir in cached[2]:
+            _forget_tree(cache, subdir)
+
+def _cached_tree_size(path, cache, tally, mtime_ns=None):
+    """
+    Calculate the size of a directory, reusing cached results for unchanged directories
+    
+    For every directory the cache stores its mtime, the total size of the files
+    directly inside it, the list of its subdirectories and how many entries
+    could not be read. When the mtime still matches, the directory is not
+    listed again; only its subdirectories are checked, and the unreadable
+    entries are counted again so the under-count stays visible. When a changed directory is listed again, cache entries of
+    subdirectories that no longer exist are dropped. Note that a directory's
+    mtime changes only when entries are added, removed or renamed, so files
+    that grow in place are not picked up until their directory changes.
+    
+    Entries are classified by _scan_entries, so the symlink and directory
+    checks are answered from readdir's d_type without a syscall and symlinks
+    are never stat'ed. Files and subdirectories are stat'ed once each; a
+    subdirectory's mtime is taken from that stat and handed down so it is not
+    stat'ed again.
+    
+    Args:
+        path (str): Path to the directory
+        cache (dict-like): Mapping of absolute path to (mtime_ns, files_size, subdirs, skipped)
+        tally (_SizeTally): Running total that counts skipped entries
+        mtime_ns (int, optional): Modification time of the directory if already known
     
     Returns:
         int: Size of the directory in bytes
     """
-    total_size = 0
+    key = os.path.abspath(path)
+    if mtime_ns is None:
+        mtime_ns = os.stat(key).st_mtime_ns
+    
+    cached = cache.get(key)
+    if cached is not None and len(cached) == 4 and cached[0] == mtime_ns:
+        files_size, skipped = cached[1], cached[3]
+        children = [(subdir, None) for subdir in cached[2]]
+        if skipped:
+            tally.skip(key, "entries could not be read when it was last listed", skipped)
+    else:
+        # The cached walk is sequential, so the tally only changes for this listing
+        skipped_before = tally.skipped
+        files_size = 0
+        children = []
+        with os.scandir(key) as it:
+            for entry, size in _scan_entries(it, key, tally):
+                if size is not None:
+                    files_size += size
+                    continue
+                try:
+                    children.append((entry.path, entry.stat(follow_symlinks=False).st_mtime_ns))
+                except OSError:
+                    # Keep it so it is retried (and counted) below and on every run
+                    children.append((entry.path, None))
+        skipped = tally.skipped - skipped_before
+        subdirs = [subdir for subdir, _ in children]
+        if cached is not None:
+            # Drop subdirectories that are gone so the cache doesn't keep them forever
+            for removed in set(cached[2]).difference(subdirs):
+                _forget_tree(cache, removed)
+        cache[key] = (mtime_ns, files_size, subdirs, skipped)
+    
+    total_size = files_size
+    for subdir, subdir_mtime_ns in children:
+        try:
+            total_size += _cached_tree_size(subdir, cache, tally, subdir_mtime_ns)
+        except OSError as e:
+            tally.skip(subdir, e)
+    return total_size
+
+def _report_skipped(directory, tally):
+    """
+    Log once if a directory check had to skip unreadable entries
+    
+    Args:
+        directory (str): Path of the checked directory
+        tally (_SizeTally): Running total of the check
+    """
+    if tally.skipped:
+        logger.warning(
+            f"Skipped {tally.skipped} unreadable entries under {directory}; its size may be "
+            f"under-counted (use --verbose to log each one)"
+        )
+
+def directory_size_at_least(directory, threshold, cache=None):
+    """
+    Calculate the size of a directory, stopping once it exceeds a threshold
+    
+    Files directly inside the directory are summed here, while each top-level
+    subdirectory is walked in its own worker thread. As soon as the running
+    total passes the threshold all walkers stop; if they left entries unread
+    the returned size is then only a lower bound. When a cache is given the walk runs sequentially
+    through _cached_tree_size and always measures the full size.
+    
+    Args:
+        directory (str): Path to the directory
+        threshold (int): Size in bytes to stop at, or None to measure everything
+        cache (dict-like, optional): Persistent size cache, e.g. a shelve
+    
+    Returns:
+        tuple: (size, exceeded, exact) with the bytes counted, whether the threshold
+            was exceeded and whether size is the full size rather than a lower bound
+    """
     try:
-        for dirpath, dirnames, filenames in os.walk(directory):
-            for filename in filenames:
-                file_path = os.path.join(dirpath, filename)
-                # Skip if it's a symbolic link
-                if not os.path.islink(file_path):
-                    try:
-                        total_size += os.path.getsize(file_path)
-                    except (OSError, FileNotFoundError) as e:
-                        logger.warning(f"Could not get size of {file_path}: {e}")
+        tally = _SizeTally(threshold)
+        if cache is not None:
+            size = _cached_tree_size(directory, cache, tally)
+            _report_skipped(directory, tally)
+            return size, threshold is not None and size > threshold, True
+        
+        subdirs = []
+        with os.scandir(directory) as it:
+            scan = _scan_entries(it, directory, tally)
+            for entry, size in scan:
+                if size is None:
+                    subdirs.append(entry.path)
+                elif not tally.add(size):
+                    if next(scan, None) is not None:
+                        tally.stopped_early = True
+                    break
+        
+        if subdirs and tally.exceeded.is_set():
+            tally.stopped_early = True
+        elif subdirs:
+            with ThreadPoolExecutor(max_workers=min(MAX_WALK_WORKERS, len(subdirs))) as executor:
+                futures = [executor.submit(_tree_size, subdir, tally) for subdir in subdirs]
+                for future in as_completed(futures):
+                    future.result()
+        
+        _report_skipped(directory, tally)
+        return tally.total, tally.exceeded.is_set(), not tally.stopped_early
     except Exception as e:
         logger.error(f"Error calculating directory size for {directory}: {str(e)}")
         raise
+
+def get_directory_size(directory, cache=None):
+    """
+    Calculate the total size of a directory recursively
     
-    return total_size
+    Args:
+        directory (str): Path to the directory
+        cache (dict-like, optional): Persistent size cache, e.g. a shelve
+    
+    Returns:
+        int: Size of the directory in bytes
+    """
+    return directory_size_at_least(directory, None, cache)[0]
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
 
 def format_size(size_bytes):
     """
@@ -108,62 +450,134 @@ def format_size(size_bytes):
     Returns:
         str: Formatted size string
     """
-    # Define units and their thresholds
-    units = [('B', 0), ('KB', 1), ('MB', 2), ('GB', 3), ('TB', 4)]
-    
-    unit_index = 0
-    size = float(size_bytes)
-    
-    # Find appropriate unit
-    for unit, index in units:
-        if size < 1024 or unit_index == len(units) - 1:
-            break
-        size /= 1024
-        unit_index += 1
+    # Every unit is 10 bits wide, so the bit length picks the unit directly
+    unit_index = min(len(_SIZE_UNITS) - 1, max(0, (int(size_bytes).bit_length() - 1) // 10))
+    size = size_bytes / (1 << (10 * unit_index))
     
     # Format with up to 2 decimal places
     if size.is_integer():
-        return f"{int(size)} {units[unit_index][0]}"
+        return f"{int(size)} {_SIZE_UNITS[unit_index]}"
     else:
-        return f"{size:.2f} {units[unit_index][0]}"
+        return f"{size:.2f} {_SIZE_UNITS[unit_index]}"
 
-def send_email(smtp_config, recipients, subject, message):
+class SMTPSession:
     """
-    Send email notification
+    SMTP connection that is opened once and reused for several messages
     
-    Args:
-        smtp_config (dict): SMTP configuration (host, port, username, password, use_tls)
-        recipients (list): List of email recipients
-        subject (str): Email subject
-        message (str): Email message body
+    Usage:
+        with SMTPSession(smtp_config) as session:
+            session.send(subject, message, recipients)
     """
-    try:
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = smtp_config['username']
-        msg['To'] = ', '.join(recipients)
-        msg['Subject'] = subject
-        
-        # Attach message body
-        msg.attach(MIMEText(message, 'plain'))
+    
+    def __init__(self, smtp_config):
+        """
+        Args:
+            smtp_config (dict): SMTP configuration (host, port, username, password, use_tls)
+        """
+        self.smtp_config = smtp_config
+        self.server = None
+    
+    def __enter__(self):
+        smtp_config = self.smtp_config
         
         # Connect to SMTP server
-        with smtplib.SMTP(smtp_config['host'], int(smtp_config['port'])) as server:
+        self.server = smtplib.SMTP(smtp_config['host'], int(smtp_config['port']))
+        try:
+            self.server.ehlo()
+            
             # Use TLS if configured
             if smtp_config.get('use_tls', 'False').lower() == 'true':
-                server.starttls()
+                self.server.starttls()
+                self.server.ehlo()
             
             # Login if credentials provided
             if smtp_config['username'] and smtp_config['password']:
-                server.login(smtp_config['username'], smtp_config['password'])
-            
-            # Send email
-            server.send_message(msg)
+                self.server.login(smtp_config['username'], smtp_config['password'])
+        except Exception:
+            self.server.close()
+            raise
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+    
+    def send(self, subject, message, recipients):
+        """
+        Send one email over the open connection
         
+        Args:
+            subject (str): Email subject
+            message (str): Email message body
+            recipients (list): List of email recipients
+        """
+        # Create a single-part plain text message
+        msg = EmailMessage()
+        msg['From'] = self.smtp_config['username']
+        msg['To'] = ', '.join(recipients)
+        msg['Subject'] = subject
+        msg.set_content(message)
+        
+        # Send email
+        self.server.send_message(msg)
         logger.info(f"Email notification sent to {recipients}")
-    except Exception as e:
-        logger.error(f"Failed to send email notification: {str(e)}")
-        raise
+
+@functools.lru_cache(maxsize=8)
+def _parse_config(config_file, mtime_ns, size):
+    """
+    Parse the configuration file into plain dictionaries
+    
+    The file's mtime and size are part of the cache key, so a changed file is
+    parsed again while repeated loads of an unchanged file are served from
+    the cache.
+    
+    Args:
+        config_file (str): Path to the configuration file
+        mtime_ns (int): Modification time of the file in nanoseconds
+        size (int): Size of the file in bytes
+    
+    Returns:
+        dict: Configuration parameters
+    """
+    # Values are used literally, so skip interpolation and tolerate duplicates
+    config = configparser.ConfigParser(interpolation=None, strict=False, empty_lines_in_values=False)
+    with open(config_file, encoding='utf-8') as f:
+        config.read_file(f)
+    
+    # Flatten every section once so later lookups don't go through configparser
+    sections = {name: dict(config.items(name, raw=True)) for name in config.sections()}
+    
+    # Extract directories; thresholds are converted to bytes once here
+    directories = {}
+    for section, options in sections.items():
+        if section.startswith('directory:'):
+            dir_name = section.split(':', 1)[1]
+            directories[dir_name] = {
+                'path': options['path'],
+                'threshold_bytes': parse_size(options['threshold'])
+            }
+    
+    # Extract email configuration
+    smtp = sections['smtp']
+    email_config = {
+        'recipients': [email.strip() for email in sections['email']['recipients'].split(',')],
+        'per_directory': sections['email'].get('per_directory', 'False').lower() == 'true',
+        'smtp': {
+            'host': smtp['host'],
+            'port': smtp['port'],
+            'username': smtp['username'],
+            'password': smtp['password'],
+            'use_tls': smtp.get('use_tls', 'False')
+        }
+    }
+    
+    return {
+        'directories': directories,
+        'email': email_config
+    }
 
 def load_config(config_file):
     """
@@ -176,77 +590,61 @@ def load_config(config_file):
         dict: Configuration parameters
     """
     try:
-        config = configparser.ConfigParser()
-        config.read(config_file)
-        
-        # Extract directories and thresholds
-        directories = {}
-        for section in config.sections():
-            if section.startswith('directory:'):
-                dir_name = section.split(':', 1)[1]
-                path = config[section]['path']
-                threshold = config[section]['threshold']
-                directories[dir_name] = {
-                    'path': path,
-                    'threshold': threshold
-                }
-        
-        # Extract email configuration
-        email_config = {
-            'recipients': [email.strip() for email in config['email']['recipients'].split(',')],
-            'smtp': {
-                'host': config['smtp']['host'],
-                'port': config['smtp']['port'],
-                'username': config['smtp']['username'],
-                'password': config['smtp']['password'],
-                'use_tls': config['smtp'].get('use_tls', 'False')
-            }
-        }
-        
-        return {
-            'directories': directories,
-            'email': email_config
-        }
+        st = os.stat(config_file)
+        return _parse_config(config_file, st.st_mtime_ns, st.st_size)
     except Exception as e:
         logger.error(f"Error loading configuration from {config_file}: {str(e)}")
         raise
 
-def check_directories(config):
+def reload_if_changed(config_file, config):
+    """
+    Reload the configuration only if the file changed since it was loaded
+    
+    Args:
+        config_file (str): Path to the configuration file
+        config (dict): Currently loaded configuration
+    
+    Returns:
+        tuple: (config, changed) with the configuration to use and whether it was re-read
+    """
+    new_config = load_config(config_file)
+    return new_config, new_config is not config
+
+# A directory that exceeded its threshold; size and threshold are in bytes and
+# exact is False when the walk stopped early, making size a lower bound
+Alert = collections.namedtuple('Alert', 'name path size threshold exact')
+
+def check_directories(config, cache=None):
     """
     Check directory sizes against thresholds and send notifications if needed
     
     Args:
         config (dict): Configuration dictionary
+        cache (dict-like, optional): Persistent size cache passed to directory_size_at_least
     """
     alerts = []
     
     for dir_name, dir_config in config['directories'].items():
         try:
             path = dir_config['path']
-            threshold_str = dir_config['threshold']
+            threshold_bytes = dir_config['threshold_bytes']
             
             # Skip if directory doesn't exist
             if not os.path.exists(path):
                 logger.warning(f"Directory {path} does not exist. Skipping.")
                 continue
             
-            # Calculate directory size
+            # Calculate directory size, stopping once the threshold is exceeded
             logger.info(f"Checking directory: {path}")
-            dir_size = get_directory_size(path)
-            threshold_bytes = parse_size(threshold_str)
+            dir_size, exceeded, exact = directory_size_at_least(path, threshold_bytes, cache)
             
-            # Compare with threshold
-            if dir_size > threshold_bytes:
+            if exceeded:
+                at_least = '' if exact else 'at least '
                 logger.warning(
-                    f"Directory {dir_name} ({path}) size {format_size(dir_size)} "
+                    f"Directory {dir_name} ({path}) size {at_least}{format_size(dir_size)} "
                     f"exceeds threshold {format_size(threshold_bytes)}"
                 )
-                alerts.append({
-                    'name': dir_name,
-                    'path': path,
-                    'size': dir_size,
-                    'threshold': threshold_bytes
-                })
+                alerts.append(Alert(dir_name, path, dir_size, threshold_bytes, exact))
         except Exception as e:
             logger.error(f"Error checking directory {dir_name}: {str(e)}")
     
@@ -254,52 +652,153 @@ def check_directories(config):
     if alerts:
         send_alerts(alerts, config['email'])
 
+def _format_alert(alert):
+    """
+    Format the report lines for one alert
+    
+    Args:
+        alert (Alert): Directory that exceeded its threshold
+    
+    Returns:
+        str: Report lines for the alert
+    """
+    at_least = '' if alert.exact else 'at least '
+    return (
+        f"Directory: {alert.name} ({alert.path})\n"
+        f"Current Size: {at_least}{format_size(alert.size)}\n"
+        f"Threshold: {format_size(alert.threshold)}\n"
+        f"Exceeded by: {at_least}{format_size(alert.size - alert.threshold)}\n\n"
+    )
+
 def send_alerts(alerts, email_config):
     """
     Send email alerts for directories exceeding thresholds
     
+    By default all alerts go out in one summary email. With per_directory
+    enabled every directory gets its own email; all of them are sent over a
+    single SMTP session.
+    
     Args:
-        alerts (list): List of alert information
+        alerts (list): List of Alert tuples
         email_config (dict): Email configuration
     """
     try:
-        # Format alert message
-        hostname = os.uname().nodename if hasattr(os, 'uname') else os.environ.get('COMPUTERNAME', 'unknown')
-        subject = f"Directory Size Alert on {hostname} - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        # Format alert messages
+        checked_at = datetime.now().strftime('%Y-%m-%d %H:%M')
+        footer = f"\nThis is an automated message from the Directory Size Monitor running on {HOSTNAME} ({checked_at})."
         
-        message = "The following directories have exceeded their size thresholds:\n\n"
-        for alert in alerts:
-            message += f"Directory: {alert['name']} ({alert['path']})\n"
-            message += f"Current Size: {format_size(alert['size'])}\n"
-            message += f"Threshold: {format_size(alert['threshold'])}\n"
-            message += f"Exceeded by: {format_size(alert['size'] - alert['threshold'])}\n\n"
-        
-        message += f"\nThis is an automated message from the Directory Size Monitor running on {hostname}."
+        if email_config.get('per_directory'):
+            messages = [
+                (
+                    f"Directory Size Alert for {alert.name} on {HOSTNAME} - {checked_at}",
+                    ''.join(["The following directory has exceeded its size threshold:\n\n", _format_alert(alert), footer])
+                )
+                for alert in alerts
+            ]
+        else:
+            parts = ["The following directories have exceeded their size thresholds:\n\n"]
+            parts.extend(_format_alert(alert) for alert in alerts)
+            parts.append(footer)
+            messages = [(f"Directory Size Alert on {HOSTNAME} - {checked_at}", ''.join(parts))]
         
-        # Send email
-        send_email(email_config['smtp'], email_config['recipients'], subject, message)
+        # Send every message over one connection
+        with SMTPSession(email_config['smtp']) as session:
+            for subject, message in messages:
+                session.send(subject, message, email_config['recipients'])
     except Exception as e:
         logger.error(f"Failed to send alerts: {str(e)}")
 
+def raise_open_file_limit():
+    """
+    Raise the soft open file limit and pre-size the descriptor table
+    
+    The parallel walk keeps many directory descriptors open at once. The soft
+    limit is raised to the hard limit (capped at MAX_OPEN_FILES), then the
+    highest descriptor is allocated and closed again so the kernel grows its
+    descriptor table once up front instead of while the walkers run. That step
+    is skipped if the highest descriptor is already open, e.g. inherited from
+    a supervisor.
+    """
+    if resource is None:
+        return
+    
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        target = MAX_OPEN_FILES if hard == resource.RLIM_INFINITY else min(hard, MAX_OPEN_FILES)
+        if soft == resource.RLIM_INFINITY or soft >= target:
+            return
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        logger.debug(f"Raised open file limit from {soft} to {target}")
+        
+        try:
+            os.fstat(target - 1)
+        except OSError as e:
+            if e.errno != errno.EBADF:
+                raise
+        else:
+            logger.debug(f"Descriptor {target - 1} is in use; not pre-sizing the descriptor table")
+            return
+        
+        fd = os.open(os.devnull, os.O_RDONLY)
+        try:
+            os.dup2(fd, target - 1)
+            os.close(target - 1)
+        finally:
+            os.close(fd)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not raise open file limit: {e}")
+
 def main():
     """
     Main function to run the directory size monitor
     """
     parser = argparse.ArgumentParser(description='Monitor directory sizes and send alerts when thresholds are exceeded')
     parser.add_argument('-c', '--config', default='directory_monitor.ini', help='Path to configuration file')
+    parser.add_argument('--cache', nargs='?', const='.dirmon_cache', default=None,
+                        help='Reuse directory sizes from this cache file for unchanged directories (default: .dirmon_cache)')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Log debug details, including every entry that could not be read')
+    parser.add_argument('-i', '--interval', type=int, default=0,
+                        help='Keep running and repeat the check every INTERVAL seconds (default: run once)')
     args = parser.parse_args()
+    if args.interval < 0:
+        parser.error('--interval must not be negative')
+    
+    if args.verbose:
+        logging.root.setLevel(logging.DEBUG)
     
     try:
         logger.info("Starting directory size monitor")
+        raise_open_file_limit()
         
         # Load configuration
         logger.info(f"Loading configuration from {args.config}")
         config = load_config(args.config)
         
-        # Check directories
-        check_directories(config)
-        
-        logger.info("Directory size check completed successfully")
+        cache = shelve.open(args.cache) if args.cache else None
+        try:
+            while True:
+                # Check directories
+                check_directories(config, cache)
+                if cache is not None:
+                    cache.sync()
+                logger.info("Directory size check completed successfully")
+                
+                if not args.interval:
+                    break
+                time.sleep(args.interval)
+                
+                try:
+                    config, changed = reload_if_changed(args.config, config)
+                    if changed:
+                        logger.info(f"Configuration reloaded from {args.config}")
+                except Exception:
+                    logger.warning("Keeping the previously loaded configuration")
+        finally:
+            if cache is not None:
+                cache.close()
+    except KeyboardInterrupt:
+        logger.info("Directory size monitor stopped")
     except Exception as e:
         logger.error(f"Program error: {str(e)}")
         sys.exit(1)
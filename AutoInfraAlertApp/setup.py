@@ -0,0 +1,23 @@
+"""
+Build script for the optional _dirsize C extension
+
+Build in place next to app.py with:
+    python setup.py build_ext --inplace
+
+app.py falls back to its pure Python walk when the extension is not built.
+The extension relies on POSIX directory calls, so it is not built on Windows.
+"""
+
+import sys
+from setuptools import setup, Extension
+
+ext_modules = []
+if sys.platform != 'win32':
+    ext_modules.append(Extension('_dirsize', sources=['_dirsize.c']))
+
+setup(
+    name='directory-monitor-dirsize',
+    version='1.0',
+    description='C directory size walker for the Directory Size Monitor',
+    ext_modules=ext_modules,
+)